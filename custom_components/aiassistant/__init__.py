@@ -10,6 +10,7 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant, ServiceCall
 from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 import voluptuous as vol
 
 from .const import (
@@ -104,11 +105,16 @@ async def _start_server(hass: HomeAssistant, entry: ConfigEntry) -> None:
     os.environ["BACKUP_DIR"] = os.path.join(hass.config.config_dir, ".ai_agent_backups")
     os.environ["LOG_LEVEL"] = config.get(CONF_LOG_LEVEL, "info")
 
+    # Clear optional settings left over from a previous setup of this entry
     if config.get(CONF_TEMPERATURE):
         os.environ["TEMPERATURE"] = str(config.get(CONF_TEMPERATURE))
+    else:
+        os.environ.pop("TEMPERATURE", None)
 
     if config.get(CONF_SYSTEM_PROMPT_FILE):
         os.environ["SYSTEM_PROMPT_FILE"] = config.get(CONF_SYSTEM_PROMPT_FILE)
+    else:
+        os.environ.pop("SYSTEM_PROMPT_FILE", None)
 
     os.environ["ENABLE_CACHE_CONTROL"] = str(config.get(CONF_ENABLE_CACHE_CONTROL, False)).lower()
     os.environ["USAGE_TRACKING"] = config.get(CONF_USAGE_TRACKING, "stream_options")
@@ -167,54 +173,50 @@ async def _start_server(hass: HomeAssistant, entry: ConfigEntry) -> None:
 
 async def _register_services(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Register component services."""
+    # Reuse Home Assistant's pooled session instead of opening one per call
+    session = async_get_clientsession(hass)
 
     async def handle_chat(call: ServiceCall) -> dict[str, Any]:
         """Handle chat service call."""
-        import aiohttp
-
         port = hass.data[DOMAIN][entry.entry_id]["port"]
         message = call.data.get("message")
         conversation_history = call.data.get("conversation_history", [])
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                f"http://localhost:{port}/api/chat",
-                json={
-                    "message": message,
-                    "conversation_history": conversation_history
-                }
-            ) as resp:
-                if resp.status == 200:
-                    result = await resp.json()
-                    return result
-                else:
-                    _LOGGER.error("Chat request failed: %s", await resp.text())
-                    return {"success": False, "error": "Request failed"}
+        async with session.post(
+            f"http://localhost:{port}/api/chat",
+            json={
+                "message": message,
+                "conversation_history": conversation_history
+            }
+        ) as resp:
+            if resp.status == 200:
+                result = await resp.json()
+                return result
+            else:
+                _LOGGER.error("Chat request failed: %s", await resp.text())
+                return {"success": False, "error": "Request failed"}
 
     async def handle_approve(call: ServiceCall) -> dict[str, Any]:
         """Handle approve service call."""
-        import aiohttp
-
         port = hass.data[DOMAIN][entry.entry_id]["port"]
         change_id = call.data.get("change_id")
         approved = call.data.get("approved", True)
         validate = call.data.get("validate", True)
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                f"http://localhost:{port}/api/approve",
-                json={
-                    "change_id": change_id,
-                    "approved": approved,
-                    "validate": validate
-                }
-            ) as resp:
-                if resp.status == 200:
-                    result = await resp.json()
-                    return result
-                else:
-                    _LOGGER.error("Approve request failed: %s", await resp.text())
-                    return {"success": False, "error": "Request failed"}
+        async with session.post(
+            f"http://localhost:{port}/api/approve",
+            json={
+                "change_id": change_id,
+                "approved": approved,
+                "validate": validate
+            }
+        ) as resp:
+            if resp.status == 200:
+                result = await resp.json()
+                return result
+            else:
+                _LOGGER.error("Approve request failed: %s", await resp.text())
+                return {"success": False, "error": "Request failed"}
 
     # Register services
     hass.services.async_register(
@@ -243,9 +245,9 @@ async def _register_panel(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Register the frontend panel."""
     from homeassistant.components.http import HomeAssistantView
     from aiohttp import web
-    import aiohttp
 
     port = hass.data[DOMAIN][entry.entry_id]["port"]
+    session = async_get_clientsession(hass)
 
     class AIConfigAgentView(HomeAssistantView):
         """Proxy view for AIassistant."""
@@ -256,56 +258,54 @@ async def _register_panel(hass: HomeAssistant, entry: ConfigEntry) -> None:
 
         async def get(self, request, path=""):
             """Proxy GET requests."""
-            async with aiohttp.ClientSession() as session:
-                url = f"http://localhost:{port}/{path}"
-                if request.query_string:
-                    url += f"?{request.query_string}"
+            url = f"http://localhost:{port}/{path}"
+            if request.query_string:
+                url += f"?{request.query_string}"
 
-                # Copy relevant headers
-                headers = {}
-                for header in ['Accept', 'Accept-Encoding', 'Accept-Language']:
-                    if header in request.headers:
-                        headers[header] = request.headers[header]
+            # Copy relevant headers
+            headers = {}
+            for header in ['Accept', 'Accept-Encoding', 'Accept-Language']:
+                if header in request.headers:
+                    headers[header] = request.headers[header]
 
-                try:
-                    async with session.get(url, headers=headers) as resp:
-                        body = await resp.read()
+            try:
+                async with session.get(url, headers=headers) as resp:
+                    body = await resp.read()
 
-                        # Create response and set Content-Type header directly to preserve charset
-                        response = web.Response(body=body, status=resp.status)
+                    # Create response and set Content-Type header directly to preserve charset
+                    response = web.Response(body=body, status=resp.status)
 
-                        # Copy all relevant headers from upstream response
-                        for header in ['Content-Type', 'Cache-Control', 'ETag', 'Last-Modified']:
-                            if header in resp.headers:
-                                response.headers[header] = resp.headers[header]
+                    # Copy all relevant headers from upstream response
+                    for header in ['Content-Type', 'Cache-Control', 'ETag', 'Last-Modified']:
+                        if header in resp.headers:
+                            response.headers[header] = resp.headers[header]
 
-                        return response
-                except Exception as err:
-                    _LOGGER.error(f"Proxy GET error for {url}: {err}")
-                    return web.Response(text=f"Proxy error: {err}", status=502)
+                    return response
+            except Exception as err:
+                _LOGGER.error(f"Proxy GET error for {url}: {err}")
+                return web.Response(text=f"Proxy error: {err}", status=502)
 
         async def post(self, request, path=""):
             """Proxy POST requests."""
             data = await request.read()
-            async with aiohttp.ClientSession() as session:
-                url = f"http://localhost:{port}/{path}"
-                headers = {"Content-Type": request.content_type or "application/json"}
+            url = f"http://localhost:{port}/{path}"
+            headers = {"Content-Type": request.content_type or "application/json"}
 
-                try:
-                    async with session.post(url, data=data, headers=headers) as resp:
-                        body = await resp.read()
+            try:
+                async with session.post(url, data=data, headers=headers) as resp:
+                    body = await resp.read()
 
-                        # Create response and copy headers
-                        response = web.Response(body=body, status=resp.status)
+                    # Create response and copy headers
+                    response = web.Response(body=body, status=resp.status)
 
-                        # Copy Content-Type header to preserve charset
-                        if 'Content-Type' in resp.headers:
-                            response.headers['Content-Type'] = resp.headers['Content-Type']
+                    # Copy Content-Type header to preserve charset
+                    if 'Content-Type' in resp.headers:
+                        response.headers['Content-Type'] = resp.headers['Content-Type']
 
-                        return response
-                except Exception as err:
-                    _LOGGER.error(f"Proxy POST error for {url}: {err}")
-                    return web.Response(text=f"Proxy error: {err}", status=502)
+                    return response
+            except Exception as err:
+                _LOGGER.error(f"Proxy POST error for {url}: {err}")
+                return web.Response(text=f"Proxy error: {err}", status=502)
 
     hass.http.register_view(AIConfigAgentView())
 
@@ -414,6 +414,18 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     # Stop the server
     entry_data = hass.data[DOMAIN].get(entry.entry_id)
     if entry_data:
+        # Close the provider clients here: the server task is cancelled below
+        # before uvicorn reaches the app's lifespan shutdown
+        from .src import main as server_app
+
+        agent_system = server_app.agent_system
+        if agent_system:
+            server_app.agent_system = None
+            try:
+                await agent_system.aclose()
+            except Exception as err:
+                _LOGGER.warning("Failed to close agent system clients: %s", err)
+
         server = entry_data.get("server")
         if server:
             server.should_exit = True
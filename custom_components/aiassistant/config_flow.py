@@ -1,7 +1,10 @@
 """Config flow for AIassistant integration."""
 from __future__ import annotations
 
+import asyncio
+from functools import lru_cache
 import logging
+import time
 from typing import Any
 import aiohttp
 
@@ -10,7 +13,9 @@ import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 import homeassistant.helpers.config_validation as cv
+from homeassistant.util.json import json_loads
 
 from .const import (
     DOMAIN,
@@ -24,45 +29,182 @@ from .const import (
     CONF_SYSTEM_PROMPT_FILE,
     CONF_ENABLE_CACHE_CONTROL,
     CONF_USAGE_TRACKING,
-    OPENAI_MODELS,
-    GEMINI_MODELS,
+    MODEL_CHOICES,
+    LOG_LEVELS,
+    USAGE_TRACKING_MODES,
     DEFAULT_API_URL,
     DEFAULT_GEMINI_API_URL,
     DEFAULT_MODEL,
     DEFAULT_LOG_LEVEL,
     DEFAULT_USAGE_TRACKING,
+    DATA_MODELS_CACHE,
+    MODELS_CACHE_TTL,
 )
 
 _LOGGER = logging.getLogger(__name__)
 
-async def fetch_openai_models(api_key: str, api_url: str | None = None) -> list[str]:
+# Model fetches currently running, keyed like the models cache, so concurrent
+# callers for the same endpoint and key share one request
+_INFLIGHT_MODEL_FETCHES: dict[tuple[str, str], asyncio.Task[tuple[str, ...]]] = {}
+
+# Fail fast on an unreachable or stalled endpoint instead of holding a pooled
+# connection for the whole request budget
+_MODELS_FETCH_TIMEOUT = aiohttp.ClientTimeout(total=10, connect=3, sock_read=5)
+
+_LOG_LEVEL_VALIDATOR = vol.In(LOG_LEVELS)
+_USAGE_TRACKING_VALIDATOR = vol.In(USAGE_TRACKING_MODES)
+
+STEP_USER_DATA_SCHEMA = vol.Schema({
+    vol.Optional(CONF_OPENAI_API_KEY, default=""): cv.string,
+    vol.Optional(CONF_GEMINI_API_KEY, default=""): cv.string,
+    vol.Optional(CONF_API_URL, default=DEFAULT_API_URL): cv.string,
+    vol.Optional(CONF_GEMINI_API_URL, default=DEFAULT_GEMINI_API_URL): cv.string,
+})
+
+# Configure step fields that do not depend on the available models
+_CONFIGURE_OPTIONS_SCHEMA = vol.Schema({
+    vol.Optional(CONF_LOG_LEVEL, default=DEFAULT_LOG_LEVEL): _LOG_LEVEL_VALIDATOR,
+    vol.Optional(CONF_TEMPERATURE): vol.Coerce(float),
+    vol.Optional(CONF_SYSTEM_PROMPT_FILE): cv.string,
+    vol.Optional(CONF_ENABLE_CACHE_CONTROL, default=False): cv.boolean,
+    vol.Optional(CONF_USAGE_TRACKING, default=DEFAULT_USAGE_TRACKING): _USAGE_TRACKING_VALIDATOR,
+})
+
+
+# Options form fields as (key, fallback default, validator). Only the defaults
+# depend on the config entry, so the validators are built once here.
+_OPTIONS_FIELDS = (
+    (CONF_OPENAI_API_KEY, "", cv.string),
+    (CONF_GEMINI_API_KEY, "", cv.string),
+    (CONF_API_URL, DEFAULT_API_URL, cv.string),
+    (CONF_GEMINI_API_URL, DEFAULT_GEMINI_API_URL, cv.string),
+    (CONF_MODEL, DEFAULT_MODEL, cv.string),  # String fallback
+    (CONF_LOG_LEVEL, DEFAULT_LOG_LEVEL, _LOG_LEVEL_VALIDATOR),
+    (CONF_TEMPERATURE, None, vol.Coerce(float)),
+    (CONF_SYSTEM_PROMPT_FILE, "", cv.string),
+    (CONF_ENABLE_CACHE_CONTROL, False, cv.boolean),
+    (CONF_USAGE_TRACKING, DEFAULT_USAGE_TRACKING, _USAGE_TRACKING_VALIDATOR),
+)
+
+# Expected key prefixes for the official endpoints. Keys for custom base URLs
+# (proxies, local servers) are not checked since their format is unknown.
+_KEY_FORMATS = (
+    (CONF_OPENAI_API_KEY, CONF_API_URL, DEFAULT_API_URL, "sk-"),
+    (CONF_GEMINI_API_KEY, CONF_GEMINI_API_URL, DEFAULT_GEMINI_API_URL, "AIza"),
+)
+
+
+def _has_invalid_key_format(data: dict[str, Any]) -> bool:
+    """Return True if a key for an official endpoint has the wrong prefix."""
+    for key_field, url_field, default_url, prefix in _KEY_FORMATS:
+        api_key = data.get(key_field)
+        if not api_key:
+            continue
+        if (data.get(url_field) or default_url).rstrip("/") != default_url:
+            continue
+        if not api_key.startswith(prefix):
+            return True
+    return False
+
+
+@lru_cache(maxsize=8)
+def _configure_schema(model_choices: tuple[str, ...]) -> vol.Schema:
+    """Return the configure step schema for the given model choices."""
+    return vol.Schema({
+        vol.Required(CONF_MODEL, default=model_choices[0]): vol.In(model_choices),
+    }).extend(_CONFIGURE_OPTIONS_SCHEMA.schema)
+
+
+async def _async_prewarm_connection(hass: HomeAssistant, url: str) -> None:
+    """Open a pooled connection to url so the next request skips the handshake."""
+    session = async_get_clientsession(hass)
+    try:
+        async with session.head(url, timeout=aiohttp.ClientTimeout(total=5)):
+            pass
+    except Exception as err:  # Best effort only
+        _LOGGER.debug("Could not pre-warm connection to %s: %s", url, err)
+
+
+async def fetch_openai_models(
+    hass: HomeAssistant, api_key: str, api_url: str | None = None
+) -> tuple[str, ...]:
     """Fetch available models from the OpenAI API."""
     if not api_key:
-        return []
+        return ()
     
     base_url = api_url or DEFAULT_API_URL
     base_url = base_url.rstrip("/")
     models_url = f"{base_url}/models"
     headers = {"Authorization": f"Bearer {api_key}"}
     
+    session = async_get_clientsession(hass)
+
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(models_url, headers=headers, timeout=10) as response:
-                if response.status != 200:
-                    _LOGGER.warning("Failed to fetch models from OpenAI: HTTP %s", response.status)
-                    return []
-                
-                data = await response.json()
-                models = [m.get("id", "") for m in data.get("data", [])]
-                models = [m for m in models if m]
-                models.sort()
-                
-                _LOGGER.info("Fetched %d models from OpenAI", len(models))
-                return models
-                
+        async with session.get(
+            models_url, headers=headers, timeout=_MODELS_FETCH_TIMEOUT
+        ) as response:
+            if response.status != 200:
+                _LOGGER.warning("Failed to fetch models from OpenAI: HTTP %s", response.status)
+                return ()
+
+            # OpenRouter-style endpoints return hundreds of models; decode with orjson
+            data = await response.json(loads=json_loads)
+            # Sorted once here; the cache hands out this immutable tuple as-is
+            models = tuple(
+                sorted(model_id for m in data.get("data", []) if (model_id := m.get("id")))
+            )
+
+            _LOGGER.info("Fetched %d models from OpenAI", len(models))
+            return models
+
     except Exception as err:
         _LOGGER.warning("Error fetching models from OpenAI: %s", err)
-        return []
+        return ()
+
+
+async def fetch_openai_models_cached(
+    hass: HomeAssistant, api_key: str, api_url: str | None = None
+) -> tuple[str, ...]:
+    """Return OpenAI models, serving cached lists while refreshing stale ones.
+
+    Fresh entries are returned as-is. Stale entries are returned immediately
+    while a background task refreshes them, so only the very first lookup for
+    a given endpoint and key waits on the network.
+    """
+    if not api_key:
+        return ()
+
+    cache: dict[tuple[str, str], tuple[float, tuple[str, ...]]] = hass.data.setdefault(
+        DOMAIN, {}
+    ).setdefault(DATA_MODELS_CACHE, {})
+    key = ((api_url or DEFAULT_API_URL).rstrip("/"), api_key)
+
+    async def _fetch() -> tuple[str, ...]:
+        models = await fetch_openai_models(hass, api_key, api_url)
+        if models:
+            cache[key] = (time.monotonic(), models)
+        return models
+
+    def _refresh() -> asyncio.Task[tuple[str, ...]]:
+        """Start a fetch for this key, or join the one already running."""
+        if (task := _INFLIGHT_MODEL_FETCHES.get(key)) is None:
+            task = hass.async_create_background_task(
+                _fetch(), "aiassistant_refresh_models"
+            )
+            _INFLIGHT_MODEL_FETCHES[key] = task
+            task.add_done_callback(lambda _: _INFLIGHT_MODEL_FETCHES.pop(key, None))
+        return task
+
+    cached = cache.get(key)
+    if cached is None:
+        # Shield the shared fetch so one caller going away does not cancel it
+        # for everyone else waiting on it
+        return await asyncio.shield(_refresh())
+
+    fetched_at, models = cached
+    if time.monotonic() - fetched_at > MODELS_CACHE_TTL:
+        _refresh()
+    return models
 
 
 async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str, Any]:
@@ -81,6 +223,7 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     def __init__(self) -> None:
         """Initialize the config flow."""
         self._data: dict[str, Any] = {}
+        self._model_choices: tuple[str, ...] | None = None
 
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
@@ -91,20 +234,23 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         if user_input is not None:
             if not user_input.get(CONF_OPENAI_API_KEY) and not user_input.get(CONF_GEMINI_API_KEY):
                 errors["base"] = "missing_keys"
+            elif _has_invalid_key_format(user_input):
+                errors["base"] = "invalid_key_format"
             else:
                 self._data.update(user_input)
+                self._model_choices = None
                 return await self.async_step_configure()
-
-        schema = vol.Schema({
-            vol.Optional(CONF_OPENAI_API_KEY, default=""): cv.string,
-            vol.Optional(CONF_GEMINI_API_KEY, default=""): cv.string,
-            vol.Optional(CONF_API_URL, default=DEFAULT_API_URL): cv.string,
-            vol.Optional(CONF_GEMINI_API_URL, default=DEFAULT_GEMINI_API_URL): cv.string,
-        })
+        else:
+            # Hide the TLS handshake for the model fetch behind the time the
+            # user spends entering their keys
+            self.hass.async_create_background_task(
+                _async_prewarm_connection(self.hass, DEFAULT_API_URL),
+                "aiassistant_prewarm",
+            )
 
         return self.async_show_form(
             step_id="user",
-            data_schema=schema,
+            data_schema=STEP_USER_DATA_SCHEMA,
             errors=errors,
         )
 
@@ -129,45 +275,33 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 self._abort_if_unique_id_configured()
                 return self.async_create_entry(title=info["title"], data=self._data)
 
-        # Build model choices
-        model_choices = []
-        
-        # Load OpenAI models if key is present
-        if self._data.get(CONF_OPENAI_API_KEY):
-            fetched_openai = await fetch_openai_models(
-                self._data[CONF_OPENAI_API_KEY], 
-                self._data.get(CONF_API_URL)
-            )
-            if fetched_openai:
-                model_choices.extend(fetched_openai)
-            else:
-                model_choices.extend(OPENAI_MODELS)
-                
-        # Load Gemini models if key is present
-        if self._data.get(CONF_GEMINI_API_KEY):
-            model_choices.extend(GEMINI_MODELS)
-            
-        # Add custom option
-        if "custom" not in model_choices:
-            model_choices.append("custom")
-
-        default_model = model_choices[0] if model_choices else DEFAULT_MODEL
-
-        schema = vol.Schema({
-            vol.Required(CONF_MODEL, default=default_model): vol.In(model_choices),
-            vol.Optional(CONF_LOG_LEVEL, default=DEFAULT_LOG_LEVEL): vol.In(["debug", "info", "warning", "error"]),
-            vol.Optional(CONF_TEMPERATURE): vol.Coerce(float),
-            vol.Optional(CONF_SYSTEM_PROMPT_FILE): cv.string,
-            vol.Optional(CONF_ENABLE_CACHE_CONTROL, default=False): cv.boolean,
-            vol.Optional(CONF_USAGE_TRACKING, default=DEFAULT_USAGE_TRACKING): vol.In(["stream_options", "usage", "disabled"]),
-        })
+        if self._model_choices is None:
+            self._model_choices = await self._async_build_model_choices()
 
         return self.async_show_form(
             step_id="configure",
-            data_schema=schema,
+            data_schema=_configure_schema(self._model_choices),
             errors=errors,
         )
 
+    async def _async_build_model_choices(self) -> tuple[str, ...]:
+        """Build the model choices offered by the configure step."""
+        has_openai = bool(self._data.get(CONF_OPENAI_API_KEY))
+        has_gemini = bool(self._data.get(CONF_GEMINI_API_KEY))
+
+        # Prefer the live OpenAI list when available
+        fetched_openai: tuple[str, ...] = ()
+        if has_openai:
+            fetched_openai = await fetch_openai_models_cached(
+                self.hass,
+                self._data[CONF_OPENAI_API_KEY],
+                self._data.get(CONF_API_URL)
+            )
+
+        if fetched_openai:
+            return (*fetched_openai, *MODEL_CHOICES[(False, has_gemini)])
+        return MODEL_CHOICES[(has_openai, has_gemini)]
+
     async def async_step_import(self, import_data: dict[str, Any]) -> FlowResult:
         """Handle import from configuration.yaml."""
         return await self.async_step_user(import_data)
@@ -196,65 +330,12 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
             # We want to update config data, so we can access it through title="" and data=
             return self.async_create_entry(title="", data=user_input)
 
-        # Get current keys
-        current_openai_key = self.config_entry.data.get(CONF_OPENAI_API_KEY, "")
-        current_gemini_key = self.config_entry.data.get(CONF_GEMINI_API_KEY, "")
-        current_api_url = self.config_entry.data.get(CONF_API_URL, DEFAULT_API_URL)
-        current_gemini_url = self.config_entry.data.get(CONF_GEMINI_API_URL, DEFAULT_GEMINI_API_URL)
-        
-        # Build models list
-        model_choices = []
-        if current_openai_key:
-            fetched_openai = await fetch_openai_models(current_openai_key, current_api_url)
-            model_choices.extend(fetched_openai if fetched_openai else OPENAI_MODELS)
-        if current_gemini_key:
-            model_choices.extend(GEMINI_MODELS)
-            
-        if "custom" not in model_choices:
-            model_choices.append("custom")
+        current = self.config_entry.data
 
         return self.async_show_form(
             step_id="init",
             data_schema=vol.Schema({
-                vol.Optional(
-                    CONF_OPENAI_API_KEY,
-                    default=current_openai_key
-                ): cv.string,
-                vol.Optional(
-                    CONF_GEMINI_API_KEY,
-                    default=current_gemini_key
-                ): cv.string,
-                vol.Optional(
-                    CONF_API_URL,
-                    default=current_api_url
-                ): cv.string,
-                vol.Optional(
-                    CONF_GEMINI_API_URL,
-                    default=current_gemini_url
-                ): cv.string,
-                vol.Optional(
-                    CONF_MODEL,
-                    default=self.config_entry.data.get(CONF_MODEL, DEFAULT_MODEL)
-                ): cv.string,  # String fallback
-                vol.Optional(
-                    CONF_LOG_LEVEL,
-                    default=self.config_entry.data.get(CONF_LOG_LEVEL, DEFAULT_LOG_LEVEL)
-                ): vol.In(["debug", "info", "warning", "error"]),
-                vol.Optional(
-                    CONF_TEMPERATURE,
-                    default=self.config_entry.data.get(CONF_TEMPERATURE)
-                ): vol.Coerce(float),
-                vol.Optional(
-                    CONF_SYSTEM_PROMPT_FILE,
-                    default=self.config_entry.data.get(CONF_SYSTEM_PROMPT_FILE, "")
-                ): cv.string,
-                vol.Optional(
-                    CONF_ENABLE_CACHE_CONTROL,
-                    default=self.config_entry.data.get(CONF_ENABLE_CACHE_CONTROL, False)
-                ): cv.boolean,
-                vol.Optional(
-                    CONF_USAGE_TRACKING,
-                    default=self.config_entry.data.get(CONF_USAGE_TRACKING, DEFAULT_USAGE_TRACKING)
-                ): vol.In(["stream_options", "usage", "disabled"]),
+                vol.Optional(key, default=current.get(key, fallback)): validator
+                for key, fallback, validator in _OPTIONS_FIELDS
             }),
         )
@@ -14,7 +14,7 @@ CONF_SYSTEM_PROMPT_FILE = "system_prompt_file"
 CONF_ENABLE_CACHE_CONTROL = "enable_cache_control"
 CONF_USAGE_TRACKING = "usage_tracking"
 
-OPENAI_MODELS = [
+OPENAI_MODELS = (
     "gpt-4o",
     "gpt-4o-mini",
     "gpt-5.2",
@@ -22,9 +22,9 @@ OPENAI_MODELS = [
     "gpt-5.2-lite",
     "gpt-5.2-mini",
     "gpt-5.2-premium",
-]
+)
 
-GEMINI_MODELS = [
+GEMINI_MODELS = (
     "gemini-3.1-flash-lite-preview",
     "gemini-3-flash-preview",
     "gemini-2.5-flash",
@@ -32,7 +32,23 @@ GEMINI_MODELS = [
     "gemini-2.0-flash",
     "gemini-1.5-pro",
     "gemini-1.5-flash",
-]
+)
+
+LOG_LEVELS = ("debug", "info", "warning", "error")
+USAGE_TRACKING_MODES = ("stream_options", "usage", "disabled")
+
+CUSTOM_MODEL = "custom"
+
+# Static model choices keyed by (has_openai_key, has_gemini_key)
+MODEL_CHOICES = {
+    (has_openai, has_gemini): (
+        *(OPENAI_MODELS if has_openai else ()),
+        *(GEMINI_MODELS if has_gemini else ()),
+        CUSTOM_MODEL,
+    )
+    for has_openai in (True, False)
+    for has_gemini in (True, False)
+}
 
 # Default values
 DEFAULT_API_URL = "https://api.openai.com/v1"
@@ -40,3 +56,8 @@ DEFAULT_GEMINI_API_URL = "https://generativelanguage.googleapis.com"
 DEFAULT_MODEL = "gpt-4o"
 DEFAULT_LOG_LEVEL = "info"
 DEFAULT_USAGE_TRACKING = "stream_options"
+
+# Fetched model lists are served from cache for this many seconds before
+# being refreshed in the background
+DATA_MODELS_CACHE = "models_cache"
+MODELS_CACHE_TTL = 300
@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import os
 from typing import Dict, Any, Optional, List
@@ -7,9 +8,80 @@ from ..config import ConfigurationManager
 from datetime import datetime, timedelta
 from dataclasses import dataclass, asdict
 
+try:
+    import orjson
+
+    def _json_dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode()
+except ImportError:
+    import json
+
+    _json_dumps = json.dumps
+
 
 logger = logging.getLogger(__name__)
 
+# Chat history roles -> Gemini content roles; anything else is model output.
+# Tool results are user-side input to Gemini, and the system prompt is sent as
+# the system instruction, so system messages in history are dropped.
+_GEMINI_ROLES = {"user": "user", "assistant": "model", "tool": "user", "system": None}
+
+# Model name prefixes served by the Gemini client; everything else goes to OpenAI
+_GEMINI_MODEL_PREFIXES = ("gemini",)
+
+# Tool definitions in OpenAI function-calling format. This is the single source
+# for both providers: the Gemini declarations are derived from it.
+_TOOL_DEFINITIONS = [
+    {
+        "type": "function",
+        "function": {
+            "name": "search_config_files",
+            "description": "Search configuration files (all YAML files + lovelace.yaml, plus individual device/entity/area files if search_pattern matches). Returns individual files like devices/{id}.json, entities/{entity_id}.json, and areas/{area_id}.json for matching items. Devices/entities/areas are ONLY included when search_pattern is provided.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "search_pattern": {
+                        "type": "string",
+                        "description": "Optional text to search for in file contents (case-insensitive). Only files containing this text will be returned. Omit to return all files."
+                    }
+                },
+                "required": []
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "propose_config_changes",
+            "description": "Propose changes to one or more configuration files for user approval. Use this to batch multiple file changes together. First use search_config_files to read files, then provide complete new content for each as YAML strings.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "changes": {
+                        "type": "array",
+                        "description": "Array of file changes. Each change must include file_path and new_content.",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "file_path": {
+                                    "type": "string",
+                                    "description": "Relative path to config file (e.g., 'configuration.yaml', 'switches.yaml'). New areas can be specified with 'areas/{area_id}.json' and must include the 'name'"
+                                },
+                                "new_content": {
+                                    "type": "string",
+                                    "description": "The complete new content of the file as a valid YAML string. Include all lines - both changed and unchanged."
+                                }
+                            },
+                            "required": ["file_path", "new_content"]
+                        }
+                    },
+                },
+                "required": ["changes"]
+            }
+        }
+    }
+]
+
 
 @dataclass
 class Changeset:
@@ -90,6 +162,7 @@ class AgentSystem:
                 logger.error(f"Failed to initialize Gemini client: {e}")
 
         self.model = os.getenv('MODEL', 'gpt-4o')
+        self.provider = "gemini" if self.model.startswith(_GEMINI_MODEL_PREFIXES) else "openai"
 
         # Get temperature from environment variable, use None if not specified
         temperature_str = os.getenv('TEMPERATURE')
@@ -109,6 +182,22 @@ class AgentSystem:
         logger.info(f"Cache control: {'enabled' if self.enable_cache_control else 'disabled'}")
         logger.info(f"Usage tracking: {self.usage_tracking}")
 
+        # OpenAI tool list; the last tool is marked for prompt caching when enabled
+        self._openai_tools = list(_TOOL_DEFINITIONS)
+        if enable_cache_control:
+            self._openai_tools[-1] = {**self._openai_tools[-1], "cache_control": {"type": "ephemeral"}}
+
+        # Gemini tool declarations, built on first use and reused for every turn
+        self._gemini_tools: Optional[List[Any]] = None
+        # Gemini request config (tools, system prompt, temperature), built on first use
+        self._gemini_config: Optional[Any] = None
+
+        # Tool name -> handler, shared by both providers
+        self._tool_handlers = {
+            "search_config_files": self._run_search_config_files,
+            "propose_config_changes": self._run_propose_config_changes,
+        }
+
         # In-memory storage for pending changesets
         self.pending_changesets: Dict[str, Changeset] = {}
 
@@ -119,6 +208,16 @@ class AgentSystem:
         else:
             logger.info("Using default system prompt")
 
+    async def aclose(self) -> None:
+        """Close the provider clients and release their pooled connections."""
+        if self.openai_client:
+            await self.openai_client.close()
+        if self.gemini_client:
+            # AsyncClient.aclose only exists in newer google-genai releases
+            aclose = getattr(self.gemini_client.aio, "aclose", None)
+            if aclose:
+                await aclose()
+
     def _get_default_system_prompt(self) -> str:
         """Get the default system prompt for the configuration agent."""
         return """You are a Home Assistant Configuration Assistant.
@@ -157,6 +256,43 @@ Response Style:
 
 Remember: You're helping manage a production Home Assistant system. Safety and clarity are paramount."""
 
+    async def _execute_tool(self, function_name: str, function_args: Dict[str, Any], iteration: int) -> Dict[str, Any]:
+        """
+        Run the tool requested by the model and return its result.
+
+        Handler errors are returned as a failed result rather than raised, so one
+        failing call doesn't discard the results of calls run alongside it.
+        """
+        handler = self._tool_handlers.get(function_name)
+        if handler is None:
+            logger.error(f"[ITERATION {iteration}] Unknown tool requested: {function_name}")
+            return {"success": False, "error": f"Unknown tool: {function_name}"}
+        try:
+            return await handler(function_args, iteration)
+        except Exception as e:
+            logger.error(f"[ITERATION {iteration}] Tool {function_name} failed: {e}", exc_info=True)
+            return {"success": False, "error": str(e)}
+
+    async def _run_search_config_files(self, function_args: Dict[str, Any], iteration: int) -> Dict[str, Any]:
+        result = await self.tools.search_config_files(**function_args)
+        logger.info(f"[ITERATION {iteration}] Tool result: success={result.get('success')}, file_count={result.get('count')}")
+        return result
+
+    async def _run_propose_config_changes(self, function_args: Dict[str, Any], iteration: int) -> Dict[str, Any]:
+        if "changes" not in function_args or not isinstance(function_args["changes"], list):
+            error_msg = (
+                "ERROR: propose_config_changes requires a 'changes' parameter with a list of file changes. "
+                "Each change must have 'file_path' and 'new_content'. "
+                "You MUST first read files with search_config_files, then provide all modified content. "
+                f"Received args: {function_args}"
+            )
+            logger.error(error_msg)
+            return {"success": False, "error": error_msg}
+
+        result = await self.tools.propose_config_changes(**function_args)
+        logger.info(f"[ITERATION {iteration}] Tool result: success={result.get('success')}, changeset_id={result.get('changeset_id')}")
+        return result
+
     async def chat_stream(
         self,
         user_message: str,
@@ -167,9 +303,7 @@ Remember: You're helping manage a production Home Assistant system. Safety and c
         Process a user message and stream response events in real-time.
         Routes to the appropriate provider (OpenAI or Gemini) based on the configured model.
         """
-        provider = "gemini" if self.model.startswith("gemini") else "openai"
-        
-        if provider == "gemini":
+        if self.provider == "gemini":
             if not getattr(self, "gemini_client", None):
                 import json
                 yield {
@@ -241,77 +375,19 @@ Remember: You're helping manage a production Home Assistant system. Safety and c
             history_length = 1  # system message
             if conversation_history:
                 # Add conversation history
+                messages.extend(conversation_history)
                 # Mark the last message in history for caching if there's substantial history
-                for idx, msg in enumerate(conversation_history):
-                    is_last_history_msg = (idx == len(conversation_history) - 1)
-                    if self.enable_cache_control and is_last_history_msg and len(conversation_history) >= 3:
-                        # Cache the conversation history at this breakpoint
-                        msg_with_cache = dict(msg)
-                        msg_with_cache["cache_control"] = {"type": "ephemeral"}
-                        messages.append(msg_with_cache)
-                    else:
-                        messages.append(msg)
+                if self.enable_cache_control and len(conversation_history) >= 3:
+                    # Cache the conversation history at this breakpoint
+                    msg_with_cache = dict(messages[-1])
+                    msg_with_cache["cache_control"] = {"type": "ephemeral"}
+                    messages[-1] = msg_with_cache
                 history_length += len(conversation_history)
 
             # Add current user message
             messages.append({"role": "user", "content": user_message})
 
-            # Define available tools for function calling with cache control
-            # Mark tools for caching to reduce repeated processing
-            propose_tool = {
-                "type": "function",
-                "function": {
-                    "name": "propose_config_changes",
-                    "description": "Propose changes to one or more configuration files for user approval. Use this to batch multiple file changes together. First use search_config_files to read files, then provide complete new content for each as YAML strings.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "changes": {
-                                "type": "array",
-                                "description": "Array of file changes. Each change must include file_path and new_content.",
-                                "items": {
-                                    "type": "object",
-                                    "properties": {
-                                        "file_path": {
-                                            "type": "string",
-                                            "description": "Relative path to config file (e.g., 'configuration.yaml', 'switches.yaml'). New areas can be specified with 'areas/{area_id}.json' and must include the 'name'"
-                                        },
-                                        "new_content": {
-                                            "type": "string",
-                                            "description": "The complete new content of the file as a valid YAML string. Include all lines - both changed and unchanged."
-                                        }
-                                    },
-                                    "required": ["file_path", "new_content"]
-                                }
-                            },
-                        },
-                        "required": ["changes"]
-                    }
-                }
-            }
-            if self.enable_cache_control:
-                propose_tool["cache_control"] = {"type": "ephemeral"}
-
-            tools = [
-                {
-                    "type": "function",
-                    "function": {
-                        "name": "search_config_files",
-                        "description": "Search configuration files (all YAML files + lovelace.yaml, plus individual device/entity/area files if search_pattern matches). Returns individual files like devices/{id}.json, entities/{entity_id}.json, and areas/{area_id}.json for matching items. Devices/entities/areas are ONLY included when search_pattern is provided.",
-                        "parameters": {
-                            "type": "object",
-                            "properties": {
-                                "search_pattern": {
-                                    "type": "string",
-                                    "description": "Optional text to search for in file contents (case-insensitive). Only files containing this text will be returned. Omit to return all files."
-                                }
-                            },
-                            "required": []
-                        }
-                    }
-                },
-                propose_tool
-            ]
+            tools = self._openai_tools
 
             # Track tool calls and results
             new_messages = []
@@ -351,9 +427,11 @@ Remember: You're helping manage a production Home Assistant system. Safety and c
 
                 stream = await self.openai_client.chat.completions.create(**api_params)
 
-                # Accumulate the streaming response
-                accumulated_content = ""
+                # Accumulate the streaming response; text and argument fragments
+                # are collected in lists and joined once instead of grown with +=
+                content_parts: List[str] = []
                 accumulated_tool_calls = []
+                argument_parts: List[List[str]] = []  # index-aligned with accumulated_tool_calls
                 current_tool_call = None
                 tool_calls_announced = False
                 tool_calls_pending_announced = False
@@ -362,24 +440,28 @@ Remember: You're helping manage a production Home Assistant system. Safety and c
                 output_tokens = 0
                 cached_tokens = 0
 
+                track_usage = self.usage_tracking != 'disabled'
+
                 async for chunk in stream:
-                    delta = chunk.choices[0].delta
+                    choice = chunk.choices[0]
+                    delta = choice.delta
 
                     # Capture token usage if available (present in final chunk)
                     # Only attempt to parse if usage tracking is not disabled
-                    if self.usage_tracking != 'disabled' and hasattr(chunk, 'usage') and chunk.usage:
-                        input_tokens = getattr(chunk.usage, 'prompt_tokens', 0) or getattr(chunk.usage, 'input_tokens', 0)
-                        output_tokens = getattr(chunk.usage, 'completion_tokens', 0) or getattr(chunk.usage, 'output_tokens', 0)
+                    usage = getattr(chunk, 'usage', None) if track_usage else None
+                    if usage:
+                        input_tokens = getattr(usage, 'prompt_tokens', 0) or getattr(usage, 'input_tokens', 0)
+                        output_tokens = getattr(usage, 'completion_tokens', 0) or getattr(usage, 'output_tokens', 0)
 
                         # Check for cached tokens - supports multiple API formats
-                        if hasattr(chunk.usage, 'cached_tokens'):
-                            cached_tokens = chunk.usage.cached_tokens or 0
-                        elif hasattr(chunk.usage, 'prompt_tokens_details') and chunk.usage.prompt_tokens_details:
-                            cached_tokens = getattr(chunk.usage.prompt_tokens_details, 'cached_tokens', 0)
-                        elif hasattr(chunk.usage, 'cached_content_token_count'):
-                            cached_tokens = chunk.usage.cached_content_token_count or 0
+                        if hasattr(usage, 'cached_tokens'):
+                            cached_tokens = usage.cached_tokens or 0
+                        elif hasattr(usage, 'prompt_tokens_details') and usage.prompt_tokens_details:
+                            cached_tokens = getattr(usage.prompt_tokens_details, 'cached_tokens', 0)
+                        elif hasattr(usage, 'cached_content_token_count'):
+                            cached_tokens = usage.cached_content_token_count or 0
 
-                        logger.debug(f"[USAGE] Parsed - Input: {input_tokens}, Output: {output_tokens}, Cached: {cached_tokens}")
+                        logger.debug("[USAGE] Parsed - Input: %s, Output: %s, Cached: %s", input_tokens, output_tokens, cached_tokens)
 
                         # Accumulate totals
                         total_input_tokens += input_tokens
@@ -388,8 +470,8 @@ Remember: You're helping manage a production Home Assistant system. Safety and c
 
                     # Stream content tokens
                     if delta.content:
-                        accumulated_content += delta.content
-                        logger.debug(f"[STREAM] Yielding token: {delta.content[:50]}")
+                        content_parts.append(delta.content)
+                        logger.debug("[STREAM] Yielding token: %.50s", delta.content)
                         yield {
                             "event": "token",
                             "data": json.dumps({
@@ -412,6 +494,7 @@ Remember: You're helping manage a production Home Assistant system. Safety and c
                                     "type": "function",
                                     "function": {"name": "", "arguments": ""}
                                 })
+                                argument_parts.append([])
 
                             current_tool_call = accumulated_tool_calls[index]
 
@@ -422,10 +505,12 @@ Remember: You're helping manage a production Home Assistant system. Safety and c
                                 if tool_call_delta.function.name:
                                     current_tool_call["function"]["name"] = tool_call_delta.function.name
                                 if tool_call_delta.function.arguments:
-                                    current_tool_call["function"]["arguments"] += tool_call_delta.function.arguments
+                                    argument_parts[index].append(tool_call_delta.function.arguments)
 
                         # Announce tool calls to UI as soon as we know them (may have partial arguments)
                         if not tool_calls_announced and any(tc.get("function", {}).get("name") for tc in accumulated_tool_calls):
+                            for tc, parts in zip(accumulated_tool_calls, argument_parts):
+                                tc["function"]["arguments"] = "".join(parts)
                             yield {
                                 "event": "tool_call",
                                 "data": json.dumps({
@@ -436,9 +521,13 @@ Remember: You're helping manage a production Home Assistant system. Safety and c
                             tool_calls_announced = True
 
                     # Check for finish reason
-                    if chunk.choices[0].finish_reason:
+                    if choice.finish_reason:
                         break
 
+                accumulated_content = "".join(content_parts)
+                for tc, parts in zip(accumulated_tool_calls, argument_parts):
+                    tc["function"]["arguments"] = "".join(parts)
+
                 # Check if we have tool calls
                 if not accumulated_tool_calls:
                     # No tool calls - final response
@@ -488,10 +577,14 @@ Remember: You're helping manage a production Home Assistant system. Safety and c
                     }
                     tool_calls_announced = True
 
-                # Execute each tool call and stream results immediately
-                for tool_idx, tool_call in enumerate(accumulated_tool_calls):
+                # Announce each tool call, then execute them concurrently
+                parsed_calls = []
+                for tool_call in accumulated_tool_calls:
                     function_name = tool_call["function"]["name"]
-                    function_args = json.loads(tool_call["function"]["arguments"])
+                    arguments = tool_call["function"]["arguments"]
+                    # Calls without parameters may stream no argument text at all
+                    function_args = json.loads(arguments) if arguments else {}
+                    parsed_calls.append((function_name, function_args))
 
                     logger.info(f"[ITERATION {iteration}] Calling tool: {function_name}")
 
@@ -506,27 +599,15 @@ Remember: You're helping manage a production Home Assistant system. Safety and c
                         })
                     }
 
-                    # Execute the tool function
-                    if function_name == "search_config_files":
-                        result = await self.tools.search_config_files(**function_args)
-                        logger.info(f"[ITERATION {iteration}] Tool result: success={result.get('success')}, file_count={result.get('count')}")
-                    elif function_name == "propose_config_changes":
-                        if "changes" not in function_args or not isinstance(function_args["changes"], list):
-                            error_msg = (
-                                "ERROR: propose_config_changes requires a 'changes' parameter with a list of file changes. "
-                                "Each change must have 'file_path' and 'new_content'. "
-                                "You MUST first read files with search_config_files, then provide all modified content. "
-                                f"Received args: {function_args}"
-                            )
-                            logger.error(error_msg)
-                            result = {"success": False, "error": error_msg}
-                        else:
-                            result = await self.tools.propose_config_changes(**function_args)
-                            logger.info(f"[ITERATION {iteration}] Tool result: success={result.get('success')}, changeset_id={result.get('changeset_id')}")
-                    else:
-                        result = {"success": False, "error": f"Unknown tool: {function_name}"}
-                        logger.error(f"[ITERATION {iteration}] Unknown tool requested: {function_name}")
+                results = await asyncio.gather(*(
+                    self._execute_tool(function_name, function_args, iteration)
+                    for function_name, function_args in parsed_calls
+                ))
 
+                # Stream results back in call order
+                for tool_idx, (tool_call, (function_name, _), result) in enumerate(
+                    zip(accumulated_tool_calls, parsed_calls, results)
+                ):
                     # Add tool result to messages with cache control on the last tool result
                     is_last_tool = (tool_idx == len(accumulated_tool_calls) - 1)
                     tool_message = {
@@ -541,7 +622,7 @@ Remember: You're helping manage a production Home Assistant system. Safety and c
                     messages.append(tool_message)
                     new_messages.append(tool_message)
 
-                    # Notify about tool result immediately after execution
+                    # Notify about each tool result once all calls have finished
                     yield {
                         "event": "tool_result",
                         "data": json.dumps({
@@ -585,62 +666,60 @@ Remember: You're helping manage a production Home Assistant system. Safety and c
                 "data": json.dumps({"error": str(e)})
             }
 
+    def _get_gemini_tools(self) -> List[Any]:
+        """Return the Gemini tool declarations, built from _TOOL_DEFINITIONS on first use."""
+        if self._gemini_tools is not None:
+            return self._gemini_tools
+
+        from google.genai import types
+
+        self._gemini_tools = [
+            types.Tool(
+                function_declarations=[
+                    types.FunctionDeclaration(
+                        name=tool["function"]["name"],
+                        description=tool["function"]["description"],
+                        parameters=tool["function"]["parameters"]
+                    )
+                    for tool in _TOOL_DEFINITIONS
+                ]
+            )
+        ]
+        return self._gemini_tools
+
+    def _get_gemini_config(self) -> Any:
+        """Return the Gemini request config, building it on first use."""
+        if self._gemini_config is not None:
+            return self._gemini_config
+
+        from google.genai import types
+
+        config_kwargs = {
+            "tools": self._get_gemini_tools(),
+            "system_instruction": self.system_prompt,
+            "automatic_function_calling": types.AutomaticFunctionCallingConfig(disable=True)
+        }
+        if self.temperature is not None:
+            config_kwargs["temperature"] = self.temperature
+
+        self._gemini_config = types.GenerateContentConfig(**config_kwargs)
+        return self._gemini_config
+
     async def _stream_gemini(self, user_message, conversation_history, image_data=None):
-        from google import genai
         from google.genai import types
-        import json
         import uuid
 
         try:
             logger.info(f"Agent streaming user message via Gemini: {user_message[:100]}...")
 
-            contents = []
-            if conversation_history:
-                for msg in conversation_history:
-                    role = "user" if msg["role"] == "user" else "model"
-                    contents.append(types.Content(role=role, parts=[types.Part(text=msg["content"])]))
-            
+            contents = [
+                types.Content(role=role, parts=[types.Part(text=msg["content"])])
+                for msg in conversation_history or ()
+                if (role := _GEMINI_ROLES.get(msg["role"], "model")) is not None
+            ]
             contents.append(types.Content(role="user", parts=[types.Part(text=user_message)]))
 
-            gemini_tools = [
-                types.Tool(
-                    function_declarations=[
-                        types.FunctionDeclaration(
-                            name="search_config_files",
-                            description="Search configuration files (all YAML files + lovelace.yaml, plus individual device/entity/area files if search_pattern matches). Returns individual files like devices/{id}.json, entities/{entity_id}.json, and areas/{area_id}.json for matching items. Devices/entities/areas are ONLY included when search_pattern is provided.",
-                            parameters={"type": "OBJECT", "properties": {"search_pattern": {"type": "STRING", "description": "Optional text to search for in file contents (case-insensitive). Only files containing this text will be returned. Omit to return all files."}}}
-                        ),
-                        types.FunctionDeclaration(
-                            name="propose_config_changes",
-                            description="Propose changes to one or more configuration files for user approval. Use this to batch multiple file changes together. First use search_config_files to read files, then provide complete new content for each as YAML strings.",
-                            parameters={
-                                "type": "OBJECT",
-                                "properties": {
-                                    "changes": {
-                                        "type": "ARRAY",
-                                        "description": "Array of file changes. Each change must include file_path and new_content.",
-                                        "items": {
-                                            "type": "OBJECT",
-                                            "properties": {
-                                                "file_path": {
-                                                    "type": "STRING",
-                                                    "description": "Relative path to config file (e.g., 'configuration.yaml')."
-                                                },
-                                                "new_content": {
-                                                    "type": "STRING",
-                                                    "description": "The complete new content of the file as a valid YAML string."
-                                                }
-                                            },
-                                            "required": ["file_path", "new_content"]
-                                        }
-                                    }
-                                },
-                                "required": ["changes"]
-                            }
-                        )
-                    ]
-                )
-            ]
+            config = self._get_gemini_config()
 
             max_iterations = 10
             iteration = 0
@@ -653,16 +732,6 @@ Remember: You're helping manage a production Home Assistant system. Safety and c
                 iteration += 1
                 logger.info(f"[ITERATION {iteration}] Calling Gemini streaming API")
 
-                config_kwargs = {
-                    "tools": gemini_tools,
-                    "system_instruction": self.system_prompt,
-                    "automatic_function_calling": types.AutomaticFunctionCallingConfig(disable=True)
-                }
-                if self.temperature is not None:
-                    config_kwargs["temperature"] = self.temperature
-                    
-                config = types.GenerateContentConfig(**config_kwargs)
-
                 # Use async client
                 stream = await self.gemini_client.aio.models.generate_content_stream(
                     model=self.model,
@@ -670,64 +739,86 @@ Remember: You're helping manage a production Home Assistant system. Safety and c
                     config=config
                 )
 
-                accumulated_content = ""
+                content_parts: List[str] = []
                 accumulated_tool_calls = []
+                # SDK FunctionCall objects, index-aligned with accumulated_tool_calls;
+                # their args stay dicts, the JSON string is only for the client
+                function_calls = []
                 tool_calls_announced = False
+                # Signatures that arrived on a function call part, by call id
+                thought_signatures: Dict[str, bytes] = {}
                 accumulated_thought_signature = None
                 
                 async for chunk in stream:
-                    if chunk.candidates and chunk.candidates[0].content and chunk.candidates[0].content.parts:
-                        for p in chunk.candidates[0].content.parts:
-                            if getattr(p, 'thought_signature', None):
-                                accumulated_thought_signature = p.thought_signature
-
-                    if chunk.function_calls:
-                        for call in chunk.function_calls:
-                            call_id = f"call_{uuid.uuid4().hex[:10]}"
-                            accumulated_tool_calls.append({
-                                "id": call_id,
-                                "type": "function",
-                                "function": {
-                                    "name": call.name,
-                                    "arguments": json.dumps(call.args)
-                                }
-                            })
-                            
+                    # Walk the parts once instead of going through chunk.text /
+                    # chunk.function_calls, which each re-scan (and model_dump)
+                    # every part of the chunk.
+                    chunk_text = ""
+                    chunk_has_calls = False
+                    candidate_content = chunk.candidates[0].content if chunk.candidates else None
+                    if candidate_content and candidate_content.parts:
+                        for p in candidate_content.parts:
+                            # Part.thought_signature is missing in early google-genai 1.x
+                            signature = getattr(p, 'thought_signature', None)
+                            if signature:
+                                accumulated_thought_signature = signature
+                            call = p.function_call
+                            if call is not None:
+                                chunk_has_calls = True
+                                function_calls.append(call)
+                                call_id = f"call_{uuid.uuid4().hex[:10]}"
+                                if signature:
+                                    thought_signatures[call_id] = signature
+                                accumulated_tool_calls.append({
+                                    "id": call_id,
+                                    "type": "function",
+                                    "function": {
+                                        "name": call.name,
+                                        "arguments": _json_dumps(call.args)
+                                    }
+                                })
+                            elif isinstance(p.text, str) and not p.thought:
+                                chunk_text += p.text
+
+                    if chunk_has_calls:
                         if not tool_calls_announced:
                             yield {
                                 "event": "tool_call",
-                                "data": json.dumps({
+                                "data": _json_dumps({
                                     "tool_calls": accumulated_tool_calls,
                                     "iteration": iteration
                                 })
                             }
                             tool_calls_announced = True
 
-                    if chunk.text:
-                        accumulated_content += chunk.text
+                    if chunk_text:
+                        content_parts.append(chunk_text)
                         yield {
                             "event": "token",
-                            "data": json.dumps({
-                                "content": chunk.text,
+                            "data": _json_dumps({
+                                "content": chunk_text,
                                 "iteration": iteration
                             })
                         }
                         
-                    if chunk.usage_metadata:
-                        input_tokens = chunk.usage_metadata.prompt_token_count or 0
-                        output_tokens = chunk.usage_metadata.candidates_token_count or 0
-                        cached_tokens = chunk.usage_metadata.cached_content_token_count or 0
+                    usage = chunk.usage_metadata
+                    if usage:
+                        input_tokens = usage.prompt_token_count or 0
+                        output_tokens = usage.candidates_token_count or 0
+                        cached_tokens = usage.cached_content_token_count or 0
                         total_input_tokens += input_tokens
                         total_output_tokens += output_tokens
                         total_cached_tokens += cached_tokens
 
+                accumulated_content = "".join(content_parts)
+
                 if not accumulated_tool_calls:
                     logger.info(f"[ITERATION {iteration}] No tool calls, final response received")
                     assistant_message = {"role": "assistant", "content": accumulated_content}
                     new_messages.append(assistant_message)
                     yield {
                         "event": "message_complete",
-                        "data": json.dumps({
+                        "data": _json_dumps({
                             "message": assistant_message,
                             "iteration": iteration,
                             "usage": {
@@ -743,13 +834,11 @@ Remember: You're helping manage a production Home Assistant system. Safety and c
                 logger.info(f"[ITERATION {iteration}] Processing {len(accumulated_tool_calls)} tool call(s)")
                 
                 parts = []
-                for idx, tc in enumerate(accumulated_tool_calls):
-                    part = types.Part.from_function_call(
-                        name=tc["function"]["name"],
-                        args=json.loads(tc["function"]["arguments"])
-                    )
-                    if accumulated_thought_signature:
-                        part.thought_signature = accumulated_thought_signature
+                for tc, call in zip(accumulated_tool_calls, function_calls):
+                    part = types.Part(function_call=call)
+                    signature = thought_signatures.get(tc["id"], accumulated_thought_signature)
+                    if signature:
+                        part.thought_signature = signature
                     parts.append(part)
                 contents.append(types.Content(role="model", parts=parts))
 
@@ -763,7 +852,7 @@ Remember: You're helping manage a production Home Assistant system. Safety and c
                 if not tool_calls_announced:
                     yield {
                         "event": "tool_call",
-                        "data": json.dumps({
+                        "data": _json_dumps({
                             "tool_calls": accumulated_tool_calls,
                             "iteration": iteration
                         })
@@ -772,38 +861,32 @@ Remember: You're helping manage a production Home Assistant system. Safety and c
 
                 tool_response_parts = []
                 
-                for tool_call in accumulated_tool_calls:
-                    function_name = tool_call["function"]["name"]
-                    function_args = json.loads(tool_call["function"]["arguments"])
+                # Announce each tool call, then execute them concurrently
+                for tool_call, call in zip(accumulated_tool_calls, function_calls):
+                    logger.info(f"[ITERATION {iteration}] Calling tool: {call.name}")
 
-                    logger.info(f"[ITERATION {iteration}] Calling tool: {function_name}")
-                    
                     yield {
                         "event": "tool_start",
-                        "data": json.dumps({
+                        "data": _json_dumps({
                             "tool_call_id": tool_call["id"],
-                            "function": function_name,
-                            "arguments": function_args,
+                            "function": call.name,
+                            "arguments": call.args or {},
                             "iteration": iteration
                         })
                     }
 
-                    if function_name == "search_config_files":
-                        result = await self.tools.search_config_files(**function_args)
-                        logger.info(f"[ITERATION {iteration}] Tool result: success={result.get('success')}")
-                    elif function_name == "propose_config_changes":
-                        if "changes" not in function_args or not isinstance(function_args["changes"], list):
-                            error_msg = f"ERROR: propose_config_changes requires a 'changes' parameter..."
-                            result = {"success": False, "error": error_msg}
-                        else:
-                            result = await self.tools.propose_config_changes(**function_args)
-                            logger.info(f"[ITERATION {iteration}] Tool result: success={result.get('success')}")
-                    else:
-                        result = {"success": False, "error": f"Unknown tool: {function_name}"}
+                results = await asyncio.gather(*(
+                    self._execute_tool(call.name, call.args or {}, iteration)
+                    for call in function_calls
+                ))
+
+                # Stream results back in call order
+                for tool_call, call, result in zip(accumulated_tool_calls, function_calls, results):
+                    function_name = call.name
 
                     yield {
                         "event": "tool_result",
-                        "data": json.dumps({
+                        "data": _json_dumps({
                             "tool_call_id": tool_call["id"],
                             "function": function_name,
                             "result": result,
@@ -814,7 +897,7 @@ Remember: You're helping manage a production Home Assistant system. Safety and c
                     tool_message = {
                         "role": "tool",
                         "tool_call_id": tool_call["id"],
-                        "content": json.dumps(result)
+                        "content": _json_dumps(result)
                     }
                     new_messages.append(tool_message)
                     
@@ -828,12 +911,12 @@ Remember: You're helping manage a production Home Assistant system. Safety and c
             if iteration >= max_iterations:
                 yield {
                     "event": "error",
-                    "data": json.dumps({"error": "Maximum iteration limit reached."})
+                    "data": _json_dumps({"error": "Maximum iteration limit reached."})
                 }
 
             yield {
                 "event": "complete",
-                "data": json.dumps({
+                "data": _json_dumps({
                     "messages": new_messages,
                     "iterations": iteration,
                     "usage": {
@@ -847,10 +930,9 @@ Remember: You're helping manage a production Home Assistant system. Safety and c
 
         except Exception as e:
             logger.error(f"Gemini Agent streaming error: {e}", exc_info=True)
-            import json
             yield {
                 "event": "error",
-                "data": json.dumps({"error": str(e)})
+                "data": _json_dumps({"error": str(e)})
             }
 
     def store_changeset(self, changeset_data: Dict[str, Any]) -> str:
@@ -6,7 +6,7 @@ These wrap the ConfigurationManager for safe AI operations.
 """
 import logging
 import os
-from typing import Dict, Any, Optional, List, TYPE_CHECKING
+from typing import Dict, Any, Optional, List
 from ..config import ConfigurationManager, ConfigurationError
 from ..ha.ha_websocket import get_lovelace_config_as_yaml
 
@@ -332,7 +332,6 @@ class AgentTools:
             }
         """
         try:
-            from pathlib import Path
             import re
 
             logger.info(f"Agent searching all files - pattern: '{search_pattern or 'none'}'")
@@ -98,12 +98,12 @@ class HomeAssistantWebSocket:
             **kwargs
         }
         await self.ws.send_json(message)
-        logger.debug(f"Sent WebSocket message: {message}")
+        logger.debug("Sent WebSocket message: %s", message)
 
         # Wait for response with matching ID
         while True:
             response = await self.ws.receive_json()
-            logger.debug(f"Received WebSocket message: {response}")
+            logger.debug("Received WebSocket message: %s", response)
 
             if response.get("id") == msg_id:
                 if response.get("type") == "result":
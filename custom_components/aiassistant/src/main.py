@@ -108,7 +108,12 @@ async def lifespan(_: FastAPI):
                 logger.warning(f"Invalid usage_tracking value '{usage_tracking}', defaulting to 'stream_options'")
                 usage_tracking = 'stream_options'
 
-            agent_system = AgentSystem(config_manager, system_prompt=system_prompt, enable_cache_control=enable_cache_control, usage_tracking=usage_tracking)
+            # Client construction loads SSL certificates from disk, so build the
+            # agent system in the executor as well
+            def init_agent_system():
+                return AgentSystem(config_manager, system_prompt=system_prompt, enable_cache_control=enable_cache_control, usage_tracking=usage_tracking)
+
+            agent_system = await loop.run_in_executor(None, init_agent_system)
             logger.info("Agent system initialized")
         else:
             logger.warning("Agent system not initialized - config manager unavailable")
@@ -119,6 +124,11 @@ async def lifespan(_: FastAPI):
 
     # Shutdown
     logger.info("=== AIassistant Shutting Down ===")
+    if agent_system:
+        try:
+            await agent_system.aclose()
+        except Exception as e:
+            logger.warning(f"Failed to close agent system clients: {e}")
 
 # Initialize FastAPI application with lifespan
 app = FastAPI(
@@ -228,18 +238,19 @@ async def chat_websocket(websocket: WebSocket):
                     conversation_history=data.get("conversation_history"),
                     image_data=data.get("image_data")
                 ):
-                    # Parse the JSON data if it's a string
+                    # Event data is normally already a JSON string, so splice it
+                    # into the frame as-is instead of decoding and re-encoding it
                     event_data = event.get("data", "{}")
                     if isinstance(event_data, str):
-                        event_data = json_lib.loads(event_data)
-
-                    # Send each event immediately
-                    message = {
-                        "event": event.get("event"),
-                        "data": event_data
-                    }
-                    await websocket.send_json(message)
-                    logger.debug(f"WebSocket sent: {event.get('event')}")
+                        await websocket.send_text(
+                            f'{{"event":{json_lib.dumps(event.get("event"))},"data":{event_data}}}'
+                        )
+                    else:
+                        await websocket.send_json({
+                            "event": event.get("event"),
+                            "data": event_data
+                        })
+                    logger.debug("WebSocket sent: %s", event.get('event'))
 
             except Exception as e:
                 logger.error(f"Stream error: {e}", exc_info=True)